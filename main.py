@@ -2,20 +2,82 @@ import os
 import sys
 import subprocess
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import platform
 import shutil
 import json
+import hashlib
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from rich.console import Console
-from rich.progress import Progress
 from rich.panel import Panel
 from rich.text import Text
-import inquirer
+import questionary
 
 console = Console()
 
+# Shared sessions so repeat calls to the same hosts reuse TCP/TLS connections.
+# API responses are cached on disk for an hour since they rarely change; file
+# downloads go through a plain session that shares the same connection pools.
+# Both are created on first use so the first prompt is not held up by
+# importing requests_cache and opening its database.
+@functools.lru_cache(maxsize=None)
+def _create_sessions():
+    import requests_cache
+
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.3))
+    session = requests_cache.CachedSession("install-a-server", use_cache_dir=True, expire_after=3600)
+    download_session = requests.Session()
+    for s in (session, download_session):
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+    return session, download_session
+
+def get_session():
+    """Return the shared, cached session used for API calls."""
+    return _create_sessions()[0]
+
+def get_download_session():
+    """Return the shared, uncached session used for file downloads."""
+    return _create_sessions()[1]
+
 PAPER_API_BASE = "https://api.papermc.io/v2/projects/paper"
 PURPUR_API_BASE = "https://api.purpurmc.org/v2/purpur"
 
+# Per-software API endpoints, so adding another software only means adding entries here.
+# Paper's /builds listing also carries each build's checksum, so the builds and
+# build info lookups share one (cached) response.
+VERSIONS_URLS = {
+    "Paper": PAPER_API_BASE,
+    "Purpur": PURPUR_API_BASE,
+}
+BUILDS_URLS = {
+    "Paper": lambda version: f"{PAPER_API_BASE}/versions/{version}/builds",
+    "Purpur": lambda version: f"{PURPUR_API_BASE}/{version}",
+}
+BUILD_INFO_URLS = {
+    "Paper": lambda version, build: f"{PAPER_API_BASE}/versions/{version}/builds",
+    "Purpur": lambda version, build: f"{PURPUR_API_BASE}/{version}/{build}",
+}
+DOWNLOAD_URLS = {
+    "Paper": lambda version, build: f"{PAPER_API_BASE}/versions/{version}/builds/{build}/downloads/paper-{version}-{build}.jar",
+    "Purpur": lambda version, build: f"{PURPUR_API_BASE}/{version}/{build}/download",
+}
+
+# Result of the first check_java() call, reused by later calls
+JAVA_CHECKED = None
+
+# Read size for streamed downloads. Large enough that the per-chunk Python
+# and progress bar overhead stays negligible on fast links.
+CHUNK_SIZE = 1 << 20
+
+# Connect/read timeout in seconds for every HTTP call, so a stalled server
+# cannot hang a prompt or a background lookup indefinitely
+REQUEST_TIMEOUT = 10
+
 AIKARS_FLAGS = (
     "java -Xms{ram} -Xmx{ram} "
     "-XX:+UseG1GC -XX:+ParallelRefProcEnabled -XX:MaxGCPauseMillis=200 "
@@ -28,73 +90,197 @@ AIKARS_FLAGS = (
     "-Daikars.new.flags=true -jar {jar_name} nogui"
 )
 
+# Quickstart plugins offered by install_plugins, mapped to their Modrinth slugs
+PLUGINS = {
+    "Chunky": "chunky",
+    "ViaVersion": "viaversion",
+    "ViaBackwards": "viabackwards",
+    "LuckPerms": "luckperms",
+    "TAB": "tab"
+}
+
+# start.sh template, assembled once so creating the script is a single format call
+START_SCRIPT = "#!/bin/sh\n" + AIKARS_FLAGS
+
 def get_versions(software):
     """Fetch available Minecraft versions."""
-    url = PAPER_API_BASE if software == "Paper" else PURPUR_API_BASE
+    url = VERSIONS_URLS[software]
     try:
-        response = requests.get(url)
+        response = get_session().get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()["versions"]
     except requests.RequestException as e:
         console.print(f"[bold red]Error fetching versions:[/bold red] {e}")
         sys.exit(1)
 
-def get_builds(software, version):
+def fetch_builds(software, version):
+    """Fetch available builds for a specific version, raising on errors."""
+    url = BUILDS_URLS[software](version)
+    response = get_session().get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    if software == "Paper":
+        # Paper returns a list of build objects with integer ids
+        return [str(b["build"]) for b in data["builds"]]
+    else:
+        # Purpur returns a list of strings in 'all'
+        return data["builds"]["all"]
+
+def run_in_background(fn, *args):
+    """Run fn(*args) on a daemon thread and return a Future for its result.
+
+    Unlike ThreadPoolExecutor workers, daemon threads do not keep the
+    interpreter alive, so an unused lookup never delays exiting.
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+def prefetch_builds(software, versions, count=5):
+    """Start fetching builds for the first few versions in the background."""
+    return {version: run_in_background(fetch_builds, software, version) for version in versions[:count]}
+
+def get_builds(software, version, prefetched=None):
     """Fetch available builds for a specific version."""
-    url = f"{PAPER_API_BASE}/versions/{version}" if software == "Paper" else f"{PURPUR_API_BASE}/{version}"
     try:
-        response = requests.get(url)
+        if prefetched and version in prefetched:
+            return prefetched[version].result()
+        return fetch_builds(software, version)
+    except requests.RequestException as e:
+        console.print(f"[bold red]Error fetching builds:[/bold red] {e}")
+        sys.exit(1)
+
+def get_build_checksum(software, version, build):
+    """Fetch the expected (algorithm, hexdigest) of a build's JAR, if published."""
+    url = BUILD_INFO_URLS[software](version, build)
+    try:
+        response = get_session().get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         if software == "Paper":
-            # Paper returns a list of integers
-            return [str(b) for b in data["builds"]]
+            # Paper publishes a SHA-256 per download, listed with the builds
+            info = next(b for b in data["builds"] if str(b["build"]) == build)
+            return "sha256", info["downloads"]["application"]["sha256"]
         else:
-            # Purpur returns a list of strings in 'all'
-            return data["builds"]["all"]
-    except requests.RequestException as e:
-        console.print(f"[bold red]Error fetching builds:[/bold red] {e}")
-        sys.exit(1)
+            # Purpur only publishes an MD5
+            return "md5", data["md5"]
+    except (requests.RequestException, KeyError, ValueError, StopIteration):
+        return None
+
+class DownloadWriter:
+    """File wrapper that hashes and reports progress for everything written."""
+
+    def __init__(self, file, digest=None, progress=None, task=None):
+        self.file = file
+        self.digest = digest
+        self.progress = progress
+        self.task = task
+
+    def write(self, data):
+        self.file.write(data)
+        if self.digest:
+            self.digest.update(data)
+        if self.progress:
+            self.progress.update(self.task, advance=len(data))
+
+def open_preallocated(path, size):
+    """Open path for binary writing with size bytes reserved on disk up front."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    if size:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            # Not available on this platform or filesystem; the file just grows as written
+            pass
+    return os.fdopen(fd, "wb", buffering=CHUNK_SIZE)
 
 def download_server(software, version, build):
     """Download the server JAR."""
     jar_name = f"{software.lower()}-{version}-{build}.jar"
+    url = DOWNLOAD_URLS[software](version, build)
     
-    if software == "Paper":
-        url = f"{PAPER_API_BASE}/versions/{version}/builds/{build}/downloads/paper-{version}-{build}.jar"
-    else:
-        url = f"{PURPUR_API_BASE}/{version}/{build}/download"
-    
+    checksum = get_build_checksum(software, version, build)
+    if not checksum:
+        console.print("[yellow]No checksum available, skipping verification.[/yellow]")
+    digest = hashlib.new(checksum[0]) if checksum else None
+
+    from rich.progress import Progress
+
     try:
-        with requests.get(url, stream=True) as response:
+        with get_download_session().get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
             response.raise_for_status()
+            response.raw.decode_content = True
             total_size = int(response.headers.get("content-length", 0))
             
             with Progress() as progress:
                 task = progress.add_task(f"[cyan]Downloading {jar_name}...", total=total_size)
-                with open(jar_name, "wb") as file:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        file.write(chunk)
-                        progress.update(task, advance=len(chunk))
+                file = open_preallocated(jar_name, total_size)
+                try:
+                    with file:
+                        # Read fixed CHUNK_SIZE blocks rather than iter_content(chunk_size=None):
+                        # for responses with a Content-Length urllib3 then returns the whole
+                        # body as a single chunk, which buffers the JAR in memory and stalls
+                        # the progress bar until the end. A readinto() loop over a reused
+                        # buffer would not help either: urllib3 implements readinto() as
+                        # read() followed by a copy into the buffer.
+                        shutil.copyfileobj(response.raw, DownloadWriter(file, digest, progress, task), CHUNK_SIZE)
+                        # Drop any reserved space the body did not fill
+                        file.truncate()
+                except BaseException:
+                    # The file was preallocated to full size, so a partial download
+                    # would otherwise look complete; never leave it behind
+                    os.remove(jar_name)
+                    raise
+
+        if checksum and digest.hexdigest() != checksum[1]:
+            console.print(f"[bold red]Checksum mismatch for {jar_name}, removing it.[/bold red]")
+            os.remove(jar_name)
+            return None
         
         console.print(f"[bold green]Successfully downloaded {jar_name}![/bold green]")
         return jar_name
-    except requests.RequestException as e:
+    except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
         console.print(f"[bold red]Error downloading server:[/bold red] {e}")
         return None
 
 def agree_to_eula():
     """Auto-agree to the Mojang EULA."""
     console.print("[yellow]Auto-agreeing to EULA...[/yellow]")
-    with open("eula.txt", "w") as f:
-        f.write("eula=true\n")
+    fd = os.open("eula.txt", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, b"eula=true\n")
+    finally:
+        os.close(fd)
     console.print("[green]EULA agreed.[/green]")
 
 def check_java():
     """Check for Java installation."""
+    global JAVA_CHECKED
+    if JAVA_CHECKED is not None:
+        return JAVA_CHECKED
+
     console.print(Panel("Checking Java Runtime Environment", style="bold blue"))
+    JAVA_CHECKED = _probe_java()
+    return JAVA_CHECKED
+
+def _probe_java():
+    """Run `java -version` and report whether it succeeded."""
+    # Look Java up on PATH first so the common "not installed" case is
+    # answered without spawning a process
+    java_path = shutil.which("java")
+    if not java_path:
+        console.print("[bold red]Java executable not found. Please install Java.[/bold red]")
+        return False
+
     try:
-        result = subprocess.run(["java", "-version"], capture_output=True, text=True)
+        result = subprocess.run([java_path, "-version"], capture_output=True, text=True, timeout=5)
         if result.returncode == 0:
             console.print(f"[green]Java is installed:[/green]\n{result.stderr.strip()}")
             return True
@@ -104,6 +290,9 @@ def check_java():
     except FileNotFoundError:
         console.print("[bold red]Java executable not found. Please install Java.[/bold red]")
         return False
+    except subprocess.TimeoutExpired:
+        console.print("[bold red]Java command timed out. Please ensure Java is installed correctly.[/bold red]")
+        return False
 
 def get_modrinth_version(slug, mc_version):
     """Fetch the latest compatible version of a plugin from Modrinth."""
@@ -114,11 +303,14 @@ def get_modrinth_version(slug, mc_version):
     
     params = {
         "loaders": loaders,
-        "game_versions": game_versions
+        "game_versions": game_versions,
+        # Every matching version is returned but only the first is used, so
+        # leave out the changelogs that make up most of the payload
+        "include_changelog": "false"
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = get_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         versions = response.json()
         if versions:
@@ -127,26 +319,25 @@ def get_modrinth_version(slug, mc_version):
     except requests.RequestException:
         return None
 
-def install_plugins(mc_version):
+def prefetch_plugin_versions(mc_version):
+    """Start checking plugin compatibility in the background."""
+    return {name: run_in_background(get_modrinth_version, slug, mc_version) for name, slug in PLUGINS.items()}
+
+def install_plugins(mc_version, prefetched=None):
     """Offer to install plugins."""
     console.print(Panel("Plugin Quickstart", style="bold cyan"))
     
-    plugins = {
-        "Chunky": "chunky",
-        "ViaVersion": "viaversion",
-        "ViaBackwards": "viabackwards",
-        "LuckPerms": "luckperms",
-        "TAB": "tab"
-    }
-    
     choices = []
     valid_plugins = {}
     
     console.print("[dim]Checking plugin compatibility...[/dim]")
     
-    # Check compatibility for all plugins
-    for name, slug in plugins.items():
-        ver = get_modrinth_version(slug, mc_version)
+    # Check compatibility for all plugins at once, unless already under way
+    if prefetched is None:
+        prefetched = prefetch_plugin_versions(mc_version)
+
+    for name, slug in PLUGINS.items():
+        ver = prefetched[name].result()
         if ver:
             valid_plugins[name] = (slug, ver)
             choices.append(name)
@@ -157,19 +348,11 @@ def install_plugins(mc_version):
         console.print("[yellow]No compatible plugins found for this version.[/yellow]")
         return
 
-    questions = [
-        inquirer.Checkbox(
-            "plugins",
-            message="Select plugins to install (Space to select/deselect, Enter to confirm)",
-            choices=choices,
-            default=choices 
-        )
-    ]
-    
-    answers = inquirer.prompt(questions)
-    if not answers: return
-    
-    selected_names = answers["plugins"]
+    selected_names = questionary.checkbox(
+        "Select plugins to install (Space to select/deselect, Enter to confirm)",
+        choices=[questionary.Choice(name, checked=True) for name in choices]
+    ).ask()
+    if selected_names is None: return
     
     if not selected_names:
         console.print("[yellow]No plugins selected.[/yellow]")
@@ -178,39 +361,65 @@ def install_plugins(mc_version):
     if not os.path.exists("plugins"):
         os.makedirs("plugins")
 
-    for name in selected_names:
+    def fetch(name):
         slug, ver_data = valid_plugins[name]
         files = ver_data.get("files", [])
         primary_file = next((f for f in files if f.get("primary")), files[0] if files else None)
-        
-        if primary_file:
-            download_url = primary_file["url"]
-            filename = primary_file["filename"]
-            
-            console.print(f"Downloading [bold]{name}[/bold]...")
-            try:
-                r = requests.get(download_url)
+        if not primary_file:
+            return name, None, None
+
+        filename = primary_file["filename"]
+        path = os.path.join("plugins", filename)
+        expected = primary_file.get("hashes", {}).get("sha512")
+        digest = hashlib.sha512() if expected else None
+        try:
+            with get_download_session().get(primary_file["url"], stream=True, timeout=REQUEST_TIMEOUT) as r:
                 r.raise_for_status()
-                with open(os.path.join("plugins", filename), "wb") as f:
-                    f.write(r.content)
+                r.raw.decode_content = True
+                f = open_preallocated(path, int(r.headers.get("content-length", 0)))
+                try:
+                    with f:
+                        shutil.copyfileobj(r.raw, DownloadWriter(f, digest), CHUNK_SIZE)
+                        f.truncate()
+                except BaseException:
+                    # Paper would try to load a zero-padded partial JAR from plugins/
+                    os.remove(path)
+                    raise
+            if expected and digest.hexdigest() != expected:
+                os.remove(path)
+                return name, filename, "checksum mismatch"
+            return name, filename, None
+        except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+            return name, filename, e
+
+    console.print(f"Downloading {len(selected_names)} plugin(s)...")
+
+    # Downloads are independent, so fetch them concurrently and report from
+    # this thread to keep the output ordered.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for name, filename, error in executor.map(fetch, selected_names):
+            if filename is None:
+                console.print(f"[red]Could not find file for {name}[/red]")
+            elif error:
+                console.print(f"[red]Failed to download {name}: {error}[/red]")
+            else:
                 console.print(f"[green]Installed {filename}[/green]")
-            except requests.RequestException as e:
-                console.print(f"[red]Failed to download {name}: {e}[/red]")
-        else:
-            console.print(f"[red]Could not find file for {name}[/red]")
     
     console.print("[bold green]Plugin installation complete![/bold green]")
 
 def create_start_script(jar_name, ram):
     """Create a start.sh script with Aikar's flags."""
-    content = "#!/bin/sh\n" + AIKARS_FLAGS.format(ram=ram, jar_name=jar_name)
+    content = START_SCRIPT.format(ram=ram, jar_name=jar_name)
     
     try:
-        with open("start.sh", "w") as f:
-            f.write(content)
-        # Make executable
-        st = os.stat("start.sh")
-        os.chmod("start.sh", st.st_mode | 0o111)
+        fd = os.open("start.sh", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            os.write(fd, content.encode())
+            # Make executable, keeping the umask-derived permission bits
+            if hasattr(os, "fchmod"):
+                os.fchmod(fd, os.fstat(fd).st_mode | 0o111)
+        finally:
+            os.close(fd)
         console.print("[green]Created start.sh with Aikar's flags.[/green]")
         return True
     except IOError as e:
@@ -227,12 +436,8 @@ def start_server(jar_name, ram=None, use_script=False):
         console.print(Panel(f"Starting Server: {jar_name}", style="bold green"))
         
         if not ram:
-            ram_q = [
-                inquirer.Text("ram", message="Enter amount of RAM to allocate (e.g., 2G, 4G)", default="2G")
-            ]
-            ram_ans = inquirer.prompt(ram_q)
-            if not ram_ans: return
-            ram = ram_ans["ram"]
+            ram = questionary.text("Enter amount of RAM to allocate (e.g., 2G, 4G)", default="2G").ask()
+            if not ram: return
 
         cmd = ["java", f"-Xms{ram}", f"-Xmx{ram}", "-jar", jar_name, "nogui"]
     
@@ -247,38 +452,31 @@ def main():
     console.print(Panel.fit("Minecraft Server Setup Utility", style="bold magenta"))
 
     # 1. Select Software
-    software_q = [
-        inquirer.List("software",
-                      message="Select Server Software",
-                      choices=["Paper", "Purpur"],
-                      carousel=True)
-    ]
-    software_ans = inquirer.prompt(software_q)
-    if not software_ans: return
-    software = software_ans["software"]
+    software = questionary.select("Select Server Software", choices=["Paper", "Purpur"]).ask()
+    if not software: return
 
     # 2. Select Version
     versions = get_versions(software)
     versions.reverse()
+    # Fetch builds for the newest versions while the user is still choosing
+    prefetched = prefetch_builds(software, versions)
     
-    version_q = [
-        inquirer.List("version",
-                      message=f"Select {software} Version",
-                      choices=versions,
-                      carousel=True)
-    ]
-    version_ans = inquirer.prompt(version_q)
-    if not version_ans: return
-    selected_version = version_ans["version"]
+    selected_version = questionary.select(f"Select {software} Version", choices=versions).ask()
+    if not selected_version: return
+    # Plugin compatibility only depends on the version, so check it while
+    # the server JAR downloads and the remaining prompts are answered. This
+    # contacts Modrinth even if plugins are declined later; the lookups are
+    # small, cached and time out without holding up exit.
+    plugin_probes = prefetch_plugin_versions(selected_version)
 
     # 3. Select Build
-    builds = get_builds(software, selected_version)
-    latest_build = builds[-1]
+    builds = get_builds(software, selected_version, prefetched)
+    # Build ids are numeric, so pick the newest by value rather than relying on API order
+    latest_build = max(builds, key=int)
     
     console.print(f"[blue]Latest build for {software} {selected_version} is {latest_build}.[/blue]")
     
-    confirm = [inquirer.Confirm("download", message=f"Download {software} {selected_version} build {latest_build}?", default=True)]
-    if not inquirer.prompt(confirm)["download"]:
+    if not questionary.confirm(f"Download {software} {selected_version} build {latest_build}?", default=True).ask():
         console.print("[yellow]Aborted.[/yellow]")
         return
 
@@ -289,8 +487,7 @@ def main():
 
     # 5. EULA
     if not os.path.exists("eula.txt"):
-        eula_q = [inquirer.Confirm("eula", message="Do you agree to the Mojang EULA?", default=True)]
-        if inquirer.prompt(eula_q)["eula"]:
+        if questionary.confirm("Do you agree to the Mojang EULA?", default=True).ask():
             agree_to_eula()
         else:
             console.print("[red]You must agree to the EULA to run the server.[/red]")
@@ -299,13 +496,11 @@ def main():
         console.print("[dim]eula.txt already exists.[/dim]")
     
     # 6. Install Plugins (New Step)
-    plugin_q = [inquirer.Confirm("plugins", message="Do you want to check for quickstart plugins?", default=True)]
-    if inquirer.prompt(plugin_q)["plugins"]:
-        install_plugins(selected_version)
+    if questionary.confirm("Do you want to check for quickstart plugins?", default=True).ask():
+        install_plugins(selected_version, plugin_probes)
 
     # 7. Check Java
-    check_q = [inquirer.Confirm("check_java", message="Check Java Runtime?", default=True)]
-    if inquirer.prompt(check_q)["check_java"]:
+    if questionary.confirm("Check Java Runtime?", default=True).ask():
         if not check_java():
             console.print("[yellow]Warning: Java check failed. Server might not start.[/yellow]")
 
@@ -313,18 +508,14 @@ def main():
     script_created = False
     ram_allocated = None
     
-    script_q = [inquirer.Confirm("create_script", message="Create start.sh with Aikar's flags?", default=True)]
-    if inquirer.prompt(script_q)["create_script"]:
-        ram_q = [inquirer.Text("ram", message="Enter amount of RAM to allocate (e.g., 2G, 4G)", default="4G")]
-        ram_ans = inquirer.prompt(ram_q)
-        if ram_ans:
-            ram_allocated = ram_ans["ram"]
+    if questionary.confirm("Create start.sh with Aikar's flags?", default=True).ask():
+        ram_allocated = questionary.text("Enter amount of RAM to allocate (e.g., 2G, 4G)", default="4G").ask()
+        if ram_allocated:
             if create_start_script(jar_file, ram_allocated):
                 script_created = True
 
     # 9. Start Server
-    start_q = [inquirer.Confirm("start", message="Start the server now?", default=True)]
-    if inquirer.prompt(start_q)["start"]:
+    if questionary.confirm("Start the server now?", default=True).ask():
         start_server(jar_file, ram=ram_allocated, use_script=script_created)
 
 if __name__ == "__main__":